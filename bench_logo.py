@@ -0,0 +1,89 @@
+"""
+Benchmark du compositeur logo : chemin RGBA d'origine contre chemin RGB direct
+pour les sources opaques (JPEG).
+
+    python bench_logo.py [--runs 10]
+
+Les résultats sont affichés et écrits dans bench_output.txt.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image, __version__ as PIL_VERSION
+
+from photoroom import FuturisticPhotoRoomApp
+
+# (largeur, hauteur) des JPEG synthétiques mesurés
+SIZES = [(3000, 2000), (900, 700)]
+ESPACE_BAS = -100
+
+
+def compose_rgba(img_path, logo, espace_bas):
+    """
+    Chemin d'origine : conversion RGBA, collage masqué, reconversion RGB pour le JPEG.
+    """
+    with Image.open(img_path) as source:
+        image = source.convert("RGBA")
+    w, h = image.size
+    max_dim = max(w, h)
+    ratio = 1000 / max_dim if max_dim > 1000 else 1.0
+    resized = image.resize((int(w * ratio), int(h * ratio)), Image.Resampling.LANCZOS)
+
+    rw, rh = resized.size
+    canvas = Image.new("RGBA", (1000, 1000), (255, 255, 255, 255))
+    canvas.paste(resized, ((1000 - rw) // 2, (1000 - rh - espace_bas) // 2), resized)
+    lw, lh = logo.size
+    canvas.paste(logo, ((1000 - lw) // 2, 1000 - lh - 15), logo)
+    return canvas.convert("RGB")
+
+
+def compose_rgb(app, img_path, logo, espace_bas):
+    """
+    Chemin actuel de _process_logo pour une sortie JPEG.
+    """
+    with Image.open(img_path) as image:
+        canvas = app._compose_logo_canvas(image, logo, espace_bas)
+    return canvas if canvas.mode == "RGB" else canvas.convert("RGB")
+
+
+def time_per_image(func, runs):
+    func()  # échauffement
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    # Les méthodes de composition n'utilisent pas la fenêtre Tk
+    app = object.__new__(FuturisticPhotoRoomApp)
+    logo = Image.new("RGBA", (300, 80), (16, 71, 116, 160))
+
+    lines = [f"Pillow {PIL_VERSION}, {args.runs} runs"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for w, h in SIZES:
+            img_path = os.path.join(tmp, f"{w}x{h}.jpg")
+            Image.effect_noise((w, h), 60).convert("RGB").save(img_path, quality=90)
+
+            same = (compose_rgba(img_path, logo, ESPACE_BAS).tobytes()
+                    == compose_rgb(app, img_path, logo, ESPACE_BAS).tobytes())
+            rgba_ms = time_per_image(lambda: compose_rgba(img_path, logo, ESPACE_BAS), args.runs)
+            rgb_ms = time_per_image(lambda: compose_rgb(app, img_path, logo, ESPACE_BAS), args.runs)
+            lines.append(f"{w}x{h} JPEG: RGBA {rgba_ms:.1f} ms -> RGB {rgb_ms:.1f} ms per image "
+                         f"(-{rgba_ms - rgb_ms:.1f} ms, {100 * (1 - rgb_ms / rgba_ms):.0f}%)"
+                         f"{'' if same else '  [OUTPUT DIFFERS]'}")
+
+    report = "\n".join(lines)
+    print(report)
+    with open("bench_output.txt", "w", encoding="utf-8") as f:
+        f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
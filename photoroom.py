@@ -1,10 +1,22 @@
 import os
 import threading
 import queue
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import requests
-from PIL import Image, ImageTk
+from PIL import Image, ImageDraw, ImageTk, JpegImagePlugin
+
+# Admission des images sources (lecture de l'en-tête seulement).
+# La limite anti "decompression bomb" de Pillow (Image.MAX_IMAGE_PIXELS) reste celle
+# par défaut ; seuls les JPEG, décodés en résolution réduite, sont admis au-delà.
+MAX_SOURCE_PIXELS = 400_000_000   # JPEG : au-delà, refus
+PIXEL_BUDGET = 40_000_000         # au-delà : décodage JPEG réduit, refus pour les autres formats
+MEMORY_LIMIT_MB = 1024            # mémoire partagée par les décodages et rendus en cours
+
+# Mémoire d'un rendu 1000x1000 : canevas RGBA + copie RGB
+CANVAS_COST = 1000 * 1000 * (4 + 3)
 
 # URL de l'API PhotoRoom (pour détourage)
 PHOTOROOM_ENDPOINT = "https://sdk.photoroom.com/v1/segment"
@@ -36,6 +48,189 @@ THEME = {
 PADDING = 20
 ENTRY_WIDTH = 50
 
+# Marge (px) entre le bas du logo et le bas du canevas 1000x1000
+LOGO_MARGIN = 15
+
+# Planche de comparaison du balayage : taille des vignettes, largeur max, limites
+SWEEP_CELL_SIZE = 250
+SWEEP_MIN_CELL_SIZE = 120
+SWEEP_SHEET_MAX_WIDTH = 1600
+SWEEP_LABEL_HEIGHT = 18
+SWEEP_MAX_LAYOUTS = 24
+SWEEP_MAX_SAMPLES = 6
+
+# Budget global de workers = nombre de cœurs. Une place est réservée aux jobs
+# interactifs (balayage, aperçu) pour qu'ils ne patientent jamais derrière un batch ;
+# le reste va au calcul (cpu). Le pool réseau (io) attend surtout le réseau : il
+# n'est pas décompté des cœurs.
+WORKER_BUDGET = max(2, os.cpu_count() or 2)
+JOB_IO = "io"
+JOB_CPU = "cpu"
+JOB_INTERACTIVE = "interactive"
+
+# Priorités des jobs (plus petit = plus prioritaire)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class JobHandle:
+    """
+    Handle d'un job soumis au JobScheduler : annulation propre à ce job
+    et attente de sa fin.
+    """
+    def __init__(self, key, kind, priority):
+        self.key = key
+        self.kind = kind
+        self.priority = priority
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def done(self):
+        return self._done_event.is_set()
+
+    def wait(self, timeout=None):
+        return self._done_event.wait(timeout)
+
+
+class MemoryBudget:
+    """
+    Budget mémoire partagé par tous les décodages en cours : un décodage attend
+    que sa réservation (estimation en octets) tienne dans la limite.
+    """
+    def __init__(self, limit_bytes):
+        self.limit = limit_bytes
+        self._used = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        # Une réservation ne dépasse jamais la limite (sinon elle attendrait indéfiniment)
+        nbytes = min(nbytes, self.limit)
+        with self._cond:
+            while self._used + nbytes > self.limit:
+                self._cond.wait()
+            self._used += nbytes
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._used -= nbytes
+                self._cond.notify_all()
+
+
+class JobScheduler:
+    """
+    Planificateur de jobs partagé entre les onglets.
+
+    Trois pools : réseau (JOB_IO, ex. appels PhotoRoom), calcul (JOB_CPU, ex.
+    redimensionnement + logo) et une place réservée aux jobs interactifs
+    (JOB_INTERACTIVE, ex. balayage). Les places CPU et interactive se partagent
+    le budget de cœurs. Chaque pool consomme une file à priorité. Un job déjà en attente ou en cours avec la même
+    clé n'est pas soumis une seconde fois : on renvoie son handle.
+
+    Chaque job occupe une place du budget de son pool ; un job peut emprunter les
+    places restées libres (borrow_workers) pour paralléliser son propre travail.
+    """
+    def __init__(self, budget=WORKER_BUDGET):
+        self.io_workers = max(1, budget // 2)
+        self.interactive_workers = 1
+        self.cpu_workers = max(1, budget - self.interactive_workers)
+        counts = {JOB_IO: self.io_workers,
+                  JOB_CPU: self.cpu_workers,
+                  JOB_INTERACTIVE: self.interactive_workers}
+        self._lock = threading.Lock()
+        self._active = {}
+        self._seq = 0
+        self._queues = {kind: queue.PriorityQueue() for kind in counts}
+        self._slots = {kind: threading.Semaphore(count) for kind, count in counts.items()}
+        self._workers = []
+        for kind, count in counts.items():
+            for _ in range(count):
+                t = threading.Thread(target=self._worker_loop, args=(kind,), daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    def submit(self, key, kind, func, *args, priority=PRIORITY_NORMAL):
+        """
+        Soumet func(handle, *args) au pool `kind`.
+        Renvoie (handle, created) ; created vaut False si un job de même clé
+        était déjà actif, auquel cas handle est celui du job existant.
+        """
+        with self._lock:
+            existing = self._active.get(key)
+            if existing is not None:
+                return existing, False
+            handle = JobHandle(key, kind, priority)
+            self._active[key] = handle
+            self._seq += 1
+            self._queues[kind].put((priority, self._seq, handle, func, args))
+        return handle, True
+
+    @contextmanager
+    def borrow_workers(self, kind, wanted):
+        """
+        Réserve, sans attendre, jusqu'à `wanted` places libres du pool `kind`
+        et renvoie le nombre obtenu. Tant qu'elles sont empruntées, aucun autre
+        job ne démarre sur ces places.
+        """
+        slots = self._slots[kind]
+        borrowed = 0
+        while borrowed < wanted and slots.acquire(blocking=False):
+            borrowed += 1
+        try:
+            yield borrowed
+        finally:
+            for _ in range(borrowed):
+                slots.release()
+
+    def active_jobs(self):
+        with self._lock:
+            return list(self._active.values())
+
+    def shutdown(self, wait=True):
+        """
+        Annule tous les jobs actifs puis arrête les workers.
+        """
+        for handle in self.active_jobs():
+            handle.cancel()
+        with self._lock:
+            # Sentinelles placées après tous les jobs (priorité infinie)
+            for q in self._queues.values():
+                for _ in self._workers:
+                    self._seq += 1
+                    q.put((float('inf'), self._seq, None, None, None))
+        if wait:
+            for t in self._workers:
+                t.join()
+
+    def _worker_loop(self, kind):
+        q = self._queues[kind]
+        while True:
+            _, _, handle, func, args = q.get()
+            if handle is None:
+                return
+            try:
+                with self._slots[kind]:
+                    # Annulé pendant l'attente : on ne le démarre pas du tout
+                    if not handle.cancelled:
+                        func(handle, *args)
+            except Exception as e:
+                print(f"[Scheduler] Job {handle.key!r} failed: {e}")
+            finally:
+                with self._lock:
+                    if self._active.get(handle.key) is handle:
+                        del self._active[handle.key]
+                handle._done_event.set()
+
+
 class FuturisticPhotoRoomApp:
     def __init__(self, root):
         self.root = root
@@ -55,10 +250,15 @@ class FuturisticPhotoRoomApp:
         # Queues de communication
         self.queue_detourage = queue.Queue()
         self.queue_logo = queue.Queue()
+        self.queue_sweep = queue.Queue()
 
-        # Flags annulation
-        self.cancel_requested_detourage = False
-        self.cancel_requested_logo = False
+        # Planificateur partagé + jobs en cours par onglet (annulation par job)
+        self.scheduler = JobScheduler()
+        self.memory_budget = MemoryBudget(MEMORY_LIMIT_MB * 1024 * 1024)
+        self.jobs_detourage = []
+        self.jobs_logo = []
+        self.jobs_sweep = []
+        self.jobs_preview = []
 
         # Conteneur principal
         self.main_container = ttk.Frame(self.root, style='Main.TFrame')
@@ -78,6 +278,7 @@ class FuturisticPhotoRoomApp:
         # Polling des queues
         self.root.after(200, self.check_detourage_queue)
         self.root.after(200, self.check_logo_queue)
+        self.root.after(200, self.check_sweep_queue)
 
         # Image de prévisualisation
         self.preview_image_ref = None
@@ -276,6 +477,38 @@ class FuturisticPhotoRoomApp:
         self.entry_espace_bas.insert(0, "-100")
         self.entry_espace_bas.pack(side='left', padx=10)
 
+        # --- Section : Balayage de mise en page ---
+        sweep_frame = self.create_section_frame(self.frame_logo, "Balayage de mise en page")
+
+        sweep_container = ttk.Frame(sweep_frame, style='Card.TFrame')
+        sweep_container.pack(fill='x')
+
+        ttk.Label(sweep_container, text="Hauteurs (px)", style='Futura.TLabel').pack(side='left')
+        self.entry_sweep_heights = ttk.Entry(sweep_container, width=14, style='Futura.TEntry')
+        self.entry_sweep_heights.insert(0, "-150:-50:25")
+        self.entry_sweep_heights.pack(side='left', padx=10)
+
+        ttk.Label(sweep_container, text="Marges logo (px)", style='Futura.TLabel').pack(side='left')
+        self.entry_sweep_margins = ttk.Entry(sweep_container, width=14, style='Futura.TEntry')
+        self.entry_sweep_margins.insert(0, str(LOGO_MARGIN))
+        self.entry_sweep_margins.pack(side='left', padx=10)
+
+        ttk.Button(sweep_container, text="Comparer",
+                   style='Futura.TButton',
+                   command=self.start_sweep_thread).pack(side='left', padx=(0, 10))
+
+        ttk.Button(sweep_container, text="Annuler",
+                   style='Futura.TButton',
+                   command=self.cancel_sweep).pack(side='left')
+
+        # Barre propre au balayage : il tourne souvent en parallèle d'un batch
+        self.progress_sweep = ttk.Progressbar(sweep_frame,
+                                              orient='horizontal',
+                                              length=400,
+                                              mode='determinate',
+                                              style='Futura.Horizontal.TProgressbar')
+        self.progress_sweep.pack(fill='x', pady=(15, 0))
+
         # --- Section : Input & Output ---
         io_frame = self.create_section_frame(self.frame_logo, "Entrée et sortie")
 
@@ -361,6 +594,35 @@ class FuturisticPhotoRoomApp:
             except Exception as e:
                 messagebox.showerror("Error", f"Could not remove API Key file: {e}")
 
+    # ----------------------------------------------------------------------------------
+    #                  Jobs des onglets (planificateur partagé)
+    # ----------------------------------------------------------------------------------
+    def _submit_job(self, jobs, key, kind, func, *args, priority=PRIORITY_NORMAL,
+                    busy_message="Ce traitement est déjà en cours."):
+        """
+        Soumet un job au planificateur et l'ajoute à la liste `jobs` de l'onglet.
+        Si un job actif occupe déjà la même clé, prévient l'utilisateur et renvoie None.
+        """
+        handle, created = self.scheduler.submit(key, kind, func, *args, priority=priority)
+        if not created:
+            if handle.cancelled:
+                messagebox.showinfo("Info", "Annulation en cours : réessayez dans un instant.")
+            else:
+                messagebox.showinfo("Info", busy_message)
+            return None
+        jobs[:] = [h for h in jobs if not h.done()] + [handle]
+        return handle
+
+    def _cancel_latest_job(self, jobs):
+        """
+        Annule uniquement le job actif le plus récent de la liste :
+        un clic = un job, les autres continuent.
+        """
+        for handle in reversed(jobs):
+            if not handle.done() and not handle.cancelled:
+                handle.cancel()
+                return
+
     # ----------------------------------------------------------------------------------
     #                    Méthodes "Browse" (choix dossiers/fichiers)
     # ----------------------------------------------------------------------------------
@@ -399,16 +661,17 @@ class FuturisticPhotoRoomApp:
     #                      Détourage PhotoRoom (Thread + Queue)
     # ----------------------------------------------------------------------------------
     def start_detourage_thread(self):
-        self.cancel_requested_detourage = False
         api_key = self.entry_api_key.get().strip()
         in_folder = self.entry_detourage_in.get().strip()
         out_folder = self.entry_detourage_out.get().strip()
 
-        t = threading.Thread(target=self._detourage_thread_func,
-                             args=(api_key, in_folder, out_folder))
-        t.start()
+        # Clé = fichiers lus et écrits : un seul job à la fois sur ce couple de dossiers
+        key = ("detourage", os.path.abspath(in_folder), os.path.abspath(out_folder))
+        self._submit_job(self.jobs_detourage, key, JOB_IO, self._detourage_thread_func,
+                         api_key, in_folder, out_folder,
+                         busy_message="Un détourage de ce dossier vers cette sortie est déjà en cours.")
 
-    def _detourage_thread_func(self, api_key, input_folder, output_folder):
+    def _detourage_thread_func(self, handle, api_key, input_folder, output_folder):
         if not api_key:
             self.queue_detourage.put(("ERROR", "Veuillez saisir votre clé API PhotoRoom"))
             return
@@ -433,7 +696,7 @@ class FuturisticPhotoRoomApp:
 
         processed = 0
         for img_path in image_paths:
-            if self.cancel_requested_detourage:
+            if handle.cancelled:
                 self.queue_detourage.put(("CANCELED", None))
                 return
             try:
@@ -488,13 +751,12 @@ class FuturisticPhotoRoomApp:
         self.root.after(200, self.check_detourage_queue)
 
     def cancel_detourage(self):
-        self.cancel_requested_detourage = True
+        self._cancel_latest_job(self.jobs_detourage)
 
     # ----------------------------------------------------------------------------------
     #              Redimension + Logo (Thread + Queue) + Preview
     # ----------------------------------------------------------------------------------
     def start_logo_thread(self):
-        self.cancel_requested_logo = False
         logo_path = self.entry_logo.get().strip()
         in_folder = self.entry_images.get().strip()
         out_folder = self.entry_sortie.get().strip()
@@ -505,11 +767,14 @@ class FuturisticPhotoRoomApp:
             messagebox.showerror("Error", "Logo height must be an integer.")
             return
 
-        t = threading.Thread(target=self._logo_thread_func,
-                             args=(logo_path, in_folder, out_folder, espace_bas))
-        t.start()
+        # Clé = dossier de sortie : deux jobs n'écrivent jamais les mêmes fichiers,
+        # quels que soient le logo ou la hauteur choisis
+        key = ("logo", os.path.abspath(out_folder))
+        self._submit_job(self.jobs_logo, key, JOB_CPU, self._logo_thread_func,
+                         logo_path, in_folder, out_folder, espace_bas,
+                         busy_message="Un traitement écrit déjà dans ce dossier de sortie.")
 
-    def _logo_thread_func(self, logo_path, in_folder, out_folder, espace_bas):
+    def _logo_thread_func(self, handle, logo_path, in_folder, out_folder, espace_bas):
         if not os.path.isfile(logo_path):
             self.queue_logo.put(("ERROR", "Veuillez sélectionner un fichier de logo valide"))
             return
@@ -520,6 +785,7 @@ class FuturisticPhotoRoomApp:
             os.makedirs(out_folder, exist_ok=True)
 
         try:
+            self._check_image_header(logo_path)
             logo = Image.open(logo_path).convert("RGBA")
         except Exception as e:
             self.queue_logo.put(("ERROR", f"Cannot open logo file: {e}"))
@@ -529,7 +795,13 @@ class FuturisticPhotoRoomApp:
         for root_dir, _, files in os.walk(in_folder):
             for f in files:
                 if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')):
-                    image_paths.append(os.path.join(root_dir, f))
+                    img_path = os.path.join(root_dir, f)
+                    try:
+                        self._check_image_header(img_path)
+                    except Exception as e:
+                        self.queue_logo.put(("MSG", f"Skipping {img_path}: {e}"))
+                        continue
+                    image_paths.append(img_path)
 
         total = len(image_paths)
         if total == 0:
@@ -540,7 +812,7 @@ class FuturisticPhotoRoomApp:
 
         processed = 0
         for img_path in image_paths:
-            if self.cancel_requested_logo:
+            if handle.cancelled:
                 self.queue_logo.put(("CANCELED", None))
                 return
             try:
@@ -565,41 +837,173 @@ class FuturisticPhotoRoomApp:
         os.makedirs(out_dir, exist_ok=True)
         output_path = os.path.join(out_dir, file_name)
 
-        with Image.open(img_path).convert("RGBA") as image:
+        with self._open_source_image(img_path) as image:
+            self._apply_reduced_decode(image)
+            with self.memory_budget.reserve(self._decode_cost(image)):
+                # Hors JPEG, on garde le canevas RGBA d'origine : même fichier qu'avant
+                # (PNG RGBA, alpha sous le logo, GIF quantifié depuis RGBA)
+                is_jpeg = file_name.lower().endswith(('.jpg', '.jpeg'))
+                canvas = self._compose_logo_canvas(image, logo, espace_bas,
+                                                   rgba_canvas=not is_jpeg)
+
+                # Convertir en RGB si format JPEG (inutile sur le chemin opaque)
+                if is_jpeg and canvas.mode != "RGB":
+                    canvas = canvas.convert("RGB")
+
+                canvas.save(output_path)
+
+    def _open_source_image(self, img_path):
+        """
+        Image.open avec la limite anti-bomb par défaut de Pillow, sauf pour les JPEG :
+        ceux-ci sont admis jusqu'à MAX_SOURCE_PIXELS car ils ne sont jamais décodés
+        en pleine résolution (_apply_reduced_decode).
+        """
+        try:
+            return Image.open(img_path)
+        except Image.DecompressionBombError as bomb:
+            try:
+                image = JpegImagePlugin.JpegImageFile(img_path)
+            except Exception:
+                raise bomb from None
+            w, h = image.size
+            if w * h > MAX_SOURCE_PIXELS:
+                image.close()
+                raise bomb
+            return image
+
+    def _check_image_header(self, img_path):
+        """
+        Admission d'une image d'après son seul en-tête (aucun pixel décodé).
+        Lève ValueError si l'image dépasse MAX_SOURCE_PIXELS, ou PIXEL_BUDGET
+        pour un format qui ne sait pas se décoder en résolution réduite
+        (au-delà de la limite de Pillow, c'est DecompressionBombError).
+        """
+        with self._open_source_image(img_path) as image:
             w, h = image.size
-            max_dim = max(w, h)
+            if w * h > MAX_SOURCE_PIXELS:
+                raise ValueError(f"{w}x{h} px exceeds the {MAX_SOURCE_PIXELS} px limit")
+            if w * h > PIXEL_BUDGET and not isinstance(image, JpegImagePlugin.JpegImageFile):
+                raise ValueError(f"{w}x{h} px exceeds the {PIXEL_BUDGET} px budget "
+                                 f"for {image.format} images")
 
-            # === MODIFICATIONS ICI: on passe le max à 1000, au lieu de 690 ===
-            if max_dim > 1000:
-                ratio = 1000 / max_dim
-            else:
-                ratio = 1.0
+    def _apply_reduced_decode(self, image):
+        """
+        Pour un JPEG au-delà de PIXEL_BUDGET, demande au décodeur une réduction DCT
+        (1/2, 1/4, 1/8) qui reste au moins à la taille finale : l'image complète
+        n'est jamais décodée. Les images plus petites gardent le décodage complet
+        + LANCZOS. À appeler avant tout accès aux pixels.
+        """
+        w, h = image.size
+        max_dim = max(w, h)
+        # isinstance couvre aussi les MPO (JPEG d'appareil photo avec segment MPF)
+        if isinstance(image, JpegImagePlugin.JpegImageFile) and w * h > PIXEL_BUDGET:
+            ratio = 1000 / max_dim
+            image.draft("RGB", (max(1, int(w * ratio)), max(1, int(h * ratio))))
 
+    def _decode_cost(self, image):
+        """
+        Estimation (octets) de la mémoire nécessaire pour décoder, convertir puis
+        composer l'image : pixels décodés + copie RGBA de travail + canevas.
+        Tient compte d'un éventuel _apply_reduced_decode déjà appliqué.
+        """
+        w, h = image.size
+        return w * h * (self._bytes_per_pixel(image.mode) + 4) + CANVAS_COST
+
+    def _bytes_per_pixel(self, mode):
+        """
+        Octets occupés par pixel dans la mémoire de Pillow : 1 pour les modes 8 bits
+        à une bande, 2 pour I;16, 4 pour I / F et pour tous les modes multi-bandes
+        (RGB est stocké sur 4 octets).
+        """
+        if mode in ("I", "F"):
+            return 4
+        if mode.startswith("I;16"):
+            return 2
+        return 1 if Image.getmodebands(mode) == 1 else 4
+
+    def _has_transparency(self, image):
+        """
+        Indique si l'image source utilise réellement la transparence :
+        canal alpha non entièrement opaque, ou couleur transparente déclarée
+        (palette / RGB / L avec info "transparency").
+        """
+        if image.mode in ("RGBA", "LA", "PA", "RGBa", "La"):
+            alpha_min, _ = image.getchannel("A").getextrema()
+            return alpha_min < 255
+        return "transparency" in image.info
+
+    def _compose_logo_canvas(self, image, logo, espace_bas, rgba_canvas=False):
+        """
+        Redimensionne l'image si nécessaire (max 1000 px sur le côté le plus long),
+        puis la place au centre d'un canevas 1000x1000 en réservant de l'espace en bas (espace_bas).
+        Enfin, colle le logo en bas du canevas.
+        rgba_canvas force un canevas RGBA même pour une source opaque.
+        """
+        resized, transparent = self._prepare_logo_source(image)
+        return self._layout_logo_canvas(resized, transparent, logo, espace_bas,
+                                        rgba_canvas=rgba_canvas)
+
+    def _prepare_logo_source(self, image):
+        """
+        Ramène l'image au mode de travail et à 1000 px max sur le côté le plus long.
+        Renvoie (image_redimensionnée, transparent).
+
+        Les sources opaques (JPEG, PNG sans alpha...) passent par un chemin RGB direct :
+        pas de conversion RGBA ni de collage masqué. Le chemin alpha est réservé
+        aux vrais détourages.
+        """
+        transparent = self._has_transparency(image)
+        if transparent:
+            source = image if image.mode == "RGBA" else image.convert("RGBA")
+        else:
+            source = image if image.mode == "RGB" else image.convert("RGB")
+
+        w, h = source.size
+        max_dim = max(w, h)
+
+        # === MODIFICATIONS ICI: on passe le max à 1000, au lieu de 690 ===
+        if max_dim > 1000:
+            ratio = 1000 / max_dim
             new_size = (int(w * ratio), int(h * ratio))
-            resized = image.resize(new_size, Image.Resampling.LANCZOS)
+            resized = source.resize(new_size, Image.Resampling.LANCZOS)
+        else:
+            resized = source
 
-            # Centrage dans un canevas 1000x1000
-            rw, rh = resized.size
-            left_margin = (1000 - rw) // 2
+        return resized, transparent
 
-            # On réserve espace_bas en bas (pour le logo), puis on centre verticalement
-            remaining_space = 1000 - rh - espace_bas
-            top_margin = remaining_space // 2
+    def _layout_logo_canvas(self, resized, transparent, logo, espace_bas, logo_margin=LOGO_MARGIN,
+                            rgba_canvas=False):
+        """
+        Centre une source déjà préparée (_prepare_logo_source) sur un canevas 1000x1000
+        en réservant espace_bas en bas, puis colle le logo à logo_margin du bas.
+        Le canevas est RGB pour une source opaque, sauf si rgba_canvas est demandé.
+        """
+        if transparent or rgba_canvas:
+            canvas_mode, background = "RGBA", (255, 255, 255, 255)
+        else:
+            canvas_mode, background = "RGB", (255, 255, 255)
 
-            canvas = Image.new("RGBA", (1000, 1000), (255, 255, 255, 255))
-            canvas.paste(resized, (left_margin, top_margin), resized)
+        # Centrage dans un canevas 1000x1000
+        rw, rh = resized.size
+        left_margin = (1000 - rw) // 2
 
-            # Collage du logo en bas (ex: y = 1000 - logo_height - 15)
-            lw, lh = logo.size
-            logo_x = (1000 - lw) // 2
-            logo_y = 1000 - lh - 15
-            canvas.paste(logo, (logo_x, logo_y), logo)
+        # On réserve espace_bas en bas (pour le logo), puis on centre verticalement
+        remaining_space = 1000 - rh - espace_bas
+        top_margin = remaining_space // 2
 
-            # Convertir en RGB si format JPEG
-            if file_name.lower().endswith(('.jpg', '.jpeg')):
-                canvas = canvas.convert("RGB")
+        canvas = Image.new(canvas_mode, (1000, 1000), background)
+        if transparent:
+            canvas.paste(resized, (left_margin, top_margin), resized)
+        else:
+            canvas.paste(resized, (left_margin, top_margin))
 
-            canvas.save(output_path)
+        # Collage du logo en bas (ex: y = 1000 - logo_height - 15)
+        lw, lh = logo.size
+        logo_x = (1000 - lw) // 2
+        logo_y = 1000 - lh - logo_margin
+        canvas.paste(logo, (logo_x, logo_y), logo)
+
+        return canvas
 
     def check_logo_queue(self):
         try:
@@ -620,12 +1024,190 @@ class FuturisticPhotoRoomApp:
                     messagebox.showwarning("Canceled", "Processing was canceled.")
                 elif msg == "DONE":
                     messagebox.showinfo("Success", "Processing completed successfully.")
+                elif msg == "PREVIEW":
+                    preview_result, preview_path = data
+                    self.show_preview_window(preview_result, preview_path)
         except queue.Empty:
             pass
         self.root.after(200, self.check_logo_queue)
 
+    def check_sweep_queue(self):
+        try:
+            while True:
+                msg, data = self.queue_sweep.get_nowait()
+                if msg == "ERROR":
+                    messagebox.showerror("Error", data)
+                elif msg == "INFO":
+                    messagebox.showinfo("Info", data)
+                elif msg == "START":
+                    self.progress_sweep["maximum"] = data
+                    self.progress_sweep["value"] = 0
+                elif msg == "PROGRESS":
+                    self.progress_sweep["value"] = data
+                elif msg == "MSG":
+                    print("[Balayage]", data)
+                elif msg == "CANCELED":
+                    messagebox.showwarning("Canceled", "Le balayage a été annulé.")
+                elif msg == "DONE":
+                    sheet, title = data
+                    self.show_preview_window(sheet, title)
+        except queue.Empty:
+            pass
+        self.root.after(200, self.check_sweep_queue)
+
     def cancel_logo(self):
-        self.cancel_requested_logo = True
+        self._cancel_latest_job(self.jobs_logo)
+
+    def cancel_sweep(self):
+        self._cancel_latest_job(self.jobs_sweep)
+
+    # ----------------------------------------------------------------------------------
+    #          Balayage hauteur / marge du logo -> planche de comparaison
+    # ----------------------------------------------------------------------------------
+    def _parse_int_values(self, text, max_count=SWEEP_MAX_LAYOUTS):
+        """
+        "a,b,c" -> [a, b, c] ; "début:fin:pas" -> plage avec fin incluse.
+        Lève ValueError si la saisie est invalide ou dépasse max_count valeurs.
+        """
+        values = []
+        for part in text.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if ':' in part:
+                bounds = [int(v) for v in part.split(':')]
+                if len(bounds) == 2:
+                    bounds.append(1 if bounds[1] >= bounds[0] else -1)
+                if len(bounds) != 3 or bounds[2] == 0:
+                    raise ValueError(f"Plage invalide : {part}")
+                start, stop, step = bounds
+                values.extend(range(start, stop + (1 if step > 0 else -1), step)[:max_count + 1])
+            else:
+                values.append(int(part))
+            if len(values) > max_count:
+                raise ValueError(f"{max_count} valeurs au maximum")
+        if not values:
+            raise ValueError("Aucune valeur")
+        # Ordre conservé, doublons retirés
+        return list(dict.fromkeys(values))
+
+    def start_sweep_thread(self):
+        logo_path = self.entry_logo.get().strip()
+        folder_in = self.entry_images.get().strip()
+        try:
+            heights = self._parse_int_values(self.entry_sweep_heights.get())
+            margins = self._parse_int_values(self.entry_sweep_margins.get())
+        except ValueError as e:
+            messagebox.showerror("Error", "Hauteurs et marges : entiers séparés par des virgules "
+                                          f"ou plage début:fin:pas ({e})")
+            return
+        if len(heights) * len(margins) > SWEEP_MAX_LAYOUTS:
+            messagebox.showerror("Error", f"{len(heights) * len(margins)} mises en page demandées : "
+                                          f"{SWEEP_MAX_LAYOUTS} au maximum")
+            return
+
+        if not os.path.isfile(logo_path):
+            messagebox.showerror("Error", "Veuillez sélectionner un fichier de logo valide")
+            return
+
+        sample_paths = filedialog.askopenfilenames(
+            title="Choose sample images for the sweep",
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.bmp *.gif *.webp")],
+            initialdir=folder_in if os.path.isdir(folder_in) else None
+        )
+        if not sample_paths:
+            return
+        if len(sample_paths) > SWEEP_MAX_SAMPLES:
+            messagebox.showerror("Error", f"{len(sample_paths)} images choisies : "
+                                          f"{SWEEP_MAX_SAMPLES} au maximum")
+            return
+
+        key = ("sweep", os.path.abspath(logo_path), tuple(sample_paths),
+               tuple(heights), tuple(margins))
+        self._submit_job(self.jobs_sweep, key, JOB_INTERACTIVE, self._sweep_thread_func,
+                         logo_path, list(sample_paths), heights, margins,
+                         priority=PRIORITY_HIGH)
+
+    def _sweep_thread_func(self, handle, logo_path, sample_paths, heights, margins):
+        """
+        Décode et prépare chaque échantillon une seule fois, puis rend toutes les
+        combinaisons (hauteur, marge) en parallèle sur les places CPU libres
+        et les assemble en une planche : un bloc de lignes par échantillon, les
+        combinaisons passant à la ligne au-delà de SWEEP_SHEET_MAX_WIDTH.
+        """
+        try:
+            self._check_image_header(logo_path)
+            logo = Image.open(logo_path).convert("RGBA")
+        except Exception as e:
+            self.queue_sweep.put(("ERROR", f"Cannot open logo file: {e}"))
+            return
+
+        sources = []
+        for path in sample_paths:
+            if handle.cancelled:
+                self.queue_sweep.put(("CANCELED", None))
+                return
+            try:
+                self._check_image_header(path)
+                with self._open_source_image(path) as image:
+                    self._apply_reduced_decode(image)
+                    with self.memory_budget.reserve(self._decode_cost(image)):
+                        resized, transparent = self._prepare_logo_source(image)
+                        # Détacher du fichier avant sa fermeture si aucune copie n'a été faite
+                        if resized is image:
+                            resized = image.copy()
+                sources.append((resized, transparent))
+            except Exception as e:
+                self.queue_sweep.put(("MSG", f"Error processing {path}: {e}"))
+
+        if not sources:
+            self.queue_sweep.put(("INFO", "No images to process."))
+            return
+
+        layouts = [(h, m) for h in heights for m in margins]
+        cell = max(SWEEP_MIN_CELL_SIZE, min(SWEEP_CELL_SIZE, SWEEP_SHEET_MAX_WIDTH // len(layouts)))
+        cols = min(len(layouts), SWEEP_SHEET_MAX_WIDTH // cell)
+        rows_per_sample = -(-len(layouts) // cols)
+        block = SWEEP_LABEL_HEIGHT + cell
+        self.queue_sweep.put(("START", len(sources) * len(layouts)))
+
+        def render(task):
+            (resized, transparent), (espace_bas, logo_margin) = task
+            if handle.cancelled:
+                return None
+            with self.memory_budget.reserve(CANVAS_COST):
+                canvas = self._layout_logo_canvas(resized, transparent, logo, espace_bas, logo_margin)
+                return canvas.convert("RGB").resize((cell, cell), Image.Resampling.LANCZOS)
+
+        tasks = [(src, layout) for src in sources for layout in layouts]
+        sheet_size = (cols * cell, len(sources) * rows_per_sample * block)
+        # Planche + sources préparées restent en mémoire pendant tout le rendu
+        kept_bytes = sheet_size[0] * sheet_size[1] * 3 + sum(
+            src.width * src.height * self._bytes_per_pixel(src.mode) for src, _ in sources)
+
+        # Ce job tourne sur la place interactive : il n'emprunte que les places CPU libres
+        with self.memory_budget.reserve(kept_bytes), \
+                self.scheduler.borrow_workers(JOB_CPU, self.scheduler.cpu_workers) as extra, \
+                ThreadPoolExecutor(max_workers=1 + extra) as executor:
+            sheet = Image.new("RGB", sheet_size, THEME['primary'])
+            draw = ImageDraw.Draw(sheet)
+            for index, thumb in enumerate(executor.map(render, tasks)):
+                if thumb is None:
+                    continue
+                sample, layout_index = divmod(index, len(layouts))
+                row = sample * rows_per_sample + layout_index // cols
+                x, y = (layout_index % cols) * cell, row * block
+                espace_bas, logo_margin = layouts[layout_index]
+                draw.text((x + 4, y + 3), f"h={espace_bas} m={logo_margin}", fill=THEME['text'])
+                sheet.paste(thumb, (x, y + SWEEP_LABEL_HEIGHT))
+                self.queue_sweep.put(("PROGRESS", index + 1))
+
+        if handle.cancelled:
+            self.queue_sweep.put(("CANCELED", None))
+            return
+
+        title = f"Balayage ({len(sources)} images x {len(layouts)} mises en page)"
+        self.queue_sweep.put(("DONE", (sheet, title)))
 
     # ----------------------------------------------------------------------------------
     #                          Prévisualisation d'une image
@@ -655,53 +1237,44 @@ class FuturisticPhotoRoomApp:
         if not preview_path:
             return
 
+        # Décodage hors du thread Tk : la réservation mémoire peut attendre le batch
+        key = ("preview", os.path.abspath(preview_path), os.path.abspath(logo_path), espace_bas)
+        self._submit_job(self.jobs_preview, key, JOB_INTERACTIVE, self._preview_thread_func,
+                         logo_path, preview_path, espace_bas, priority=PRIORITY_HIGH)
+
+    def _preview_thread_func(self, handle, logo_path, preview_path, espace_bas):
         try:
+            self._check_image_header(logo_path)
+            self._check_image_header(preview_path)
             logo_img = Image.open(logo_path).convert("RGBA")
-            with Image.open(preview_path).convert("RGBA") as source_img:
-                preview_result = self._process_image_preview(source_img, logo_img, espace_bas)
-            self.show_preview_window(preview_result, preview_path)
+            with self._open_source_image(preview_path) as source_img:
+                self._apply_reduced_decode(source_img)
+                with self.memory_budget.reserve(self._decode_cost(source_img)):
+                    preview_result = self._process_image_preview(source_img, logo_img, espace_bas)
         except Exception as e:
-            messagebox.showerror("Error", f"Preview generation failed: {e}")
+            self.queue_logo.put(("ERROR", f"Preview generation failed: {e}"))
+            return
+        if not handle.cancelled:
+            self.queue_logo.put(("PREVIEW", (preview_result, preview_path)))
 
-    def _process_image_preview(self, image_rgba, logo_rgba, espace_bas):
+    def _process_image_preview(self, source_img, logo_rgba, espace_bas):
         """
         Même logique que _process_logo mais en mode "preview".
-        On applique le redimensionnement max 1000 px, et on centre l’image
-        sur un canevas 1000×1000, puis on colle le logo.
         """
-        w, h = image_rgba.size
-        max_dim = max(w, h)
-
-        # === MODIFICATIONS ICI: on passe le max à 1000, au lieu de 690 ===
-        if max_dim > 1000:
-            ratio = 1000 / max_dim
-        else:
-            ratio = 1.0
-
-        new_size = (int(w * ratio), int(h * ratio))
-        resized = image_rgba.resize(new_size, Image.Resampling.LANCZOS)
-
-        rw, rh = resized.size
-        left_margin = (1000 - rw) // 2
-
-        remaining_space = 1000 - rh - espace_bas
-        top_margin = remaining_space // 2
-
-        canvas = Image.new("RGBA", (1000, 1000), (255, 255, 255, 255))
-        canvas.paste(resized, (left_margin, top_margin), resized)
-
-        lw, lh = logo_rgba.size
-        logo_x = (1000 - lw) // 2
-        logo_y = 1000 - lh - 15
-        canvas.paste(logo_rgba, (logo_x, logo_y), logo_rgba)
-
-        return canvas
+        return self._compose_logo_canvas(source_img, logo_rgba, espace_bas)
 
     def show_preview_window(self, pil_image, image_path):
         preview_win = tk.Toplevel(self.root)
         preview_win.title(f"Preview: {os.path.basename(image_path)}")
         preview_win.configure(bg=THEME['primary'])
 
+        # La fenêtre ne défile pas : on réduit l'image pour qu'elle tienne à l'écran
+        max_w = preview_win.winfo_screenwidth() - 100
+        max_h = preview_win.winfo_screenheight() - 160
+        if pil_image.width > max_w or pil_image.height > max_h:
+            pil_image = pil_image.copy()
+            pil_image.thumbnail((max_w, max_h), Image.Resampling.LANCZOS)
+
         self.preview_image_ref = ImageTk.PhotoImage(pil_image)
         lbl = tk.Label(preview_win, image=self.preview_image_ref, bg=THEME['primary'])
         lbl.pack(padx=10, pady=10)
@@ -721,6 +1294,7 @@ def main():
     root = tk.Tk()
     app = FuturisticPhotoRoomApp(root)
     root.mainloop()
+    app.scheduler.shutdown()
 
 if __name__ == "__main__":
     main()